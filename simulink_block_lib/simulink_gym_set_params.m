@@ -0,0 +1,26 @@
+function simIn = simulink_gym_set_params(simIn, modelName, blockPaths, params, values, modelParams, modelValues, varNames, varValues)
+% Sets block parameters, model parameters and model workspace variables of
+% a Simulink.SimulationInput object. This allows applying all pending
+% changes with a single call from the Simulink Gym wrapper instead of one
+% call per parameter.
+%
+%   simIn:       Simulink.SimulationInput object
+%   modelName:   name of the model (for the model workspace)
+%   blockPaths:  cell array of block paths
+%   params:      cell array of block parameter names
+%   values:      cell array of block parameter values (as char arrays)
+%   modelParams: cell array of model parameter names
+%   modelValues: cell array of model parameter values (as char arrays)
+%   varNames:    cell array of workspace variable names
+%   varValues:   cell array of workspace variable values
+
+    for i = 1:numel(blockPaths)
+        simIn = simIn.setBlockParameter(blockPaths{i}, params{i}, values{i});
+    end
+    for i = 1:numel(modelParams)
+        simIn = simIn.setModelParameter(modelParams{i}, modelValues{i});
+    end
+    for i = 1:numel(varNames)
+        simIn = simIn.setVariable(varNames{i}, varValues{i}, 'Workspace', modelName);
+    end
+end
@@ -1,14 +1,75 @@
 import os
-import matlab.engine
+import contextlib
+import socket
 import gym
-from . import logger, SIMULINK_BLOCK_LIB_PATH
+from . import logger, spaces, SIMULINK_BLOCK_LIB_PATH
 import threading
+from concurrent.futures import Future
 import numpy as np
-from typing import Union
+from typing import List, Tuple, Union
 from pathlib import Path
 from .observations import Observations
 from .utils import CommSocket
 
+# Matlab engines shared by name between the environments of this process:
+_shared_matlab_engines = {}
+
+
+def _sibling_cpus() -> Tuple[int, int]:
+    """Get two available CPUs sharing a physical core (Linux only).
+
+    Falls back to the first two available CPUs if no sibling hyperthreads exist.
+
+    Returns:
+        tuple of two CPU indices
+    """
+    cpus = sorted(os.sched_getaffinity(0))
+    for cpu in cpus:
+        try:
+            with open(
+                f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list"
+            ) as siblings_file:
+                siblings_list = siblings_file.read().strip()
+        except OSError:
+            break
+        # The list is given as ranges (e.g., "0-1") or single CPUs (e.g., "0,8"):
+        siblings = []
+        for entry in siblings_list.split(","):
+            first, _, last = entry.partition("-")
+            siblings.extend(range(int(first), int(last or first) + 1))
+        siblings = [sibling for sibling in siblings if sibling != cpu]
+        for sibling in siblings:
+            if sibling in cpus:
+                return cpu, sibling
+    return cpus[0], cpus[1 % len(cpus)]
+
+
+def _matlab_interpreter_threads(matlab_pid: int) -> List[int]:
+    """Get the IDs of the threads of a Matlab process executing Matlab code (Linux
+    only).
+
+    Matlab names these threads "MCR <n> interpret", which run the simulation when
+    calling sim() through the Matlab engine.
+
+    Parameters:
+        matlab_pid: int
+            process ID of Matlab
+
+    Returns:
+        list of thread IDs
+    """
+    thread_ids = []
+    for thread_id in os.listdir(f"/proc/{matlab_pid}/task"):
+        try:
+            with open(f"/proc/{matlab_pid}/task/{thread_id}/comm") as comm_file:
+                thread_name = comm_file.read().strip()
+        except OSError:
+            # Thread ended in the meantime:
+            continue
+        if thread_name.startswith("MCR") and "interpret" in thread_name:
+            thread_ids.append(int(thread_id))
+    return thread_ids
+
 
 class SimulinkEnv(gym.Env):
     """Wrapper class for using Simulink models through the Gym interface."""
@@ -22,6 +83,13 @@ class SimulinkEnv(gym.Env):
         send_port: int = 42313,
         recv_port: int = 42312,
         model_debug: bool = False,
+        ipc: str = "tcp",
+        copy_state: bool = True,
+        check_actions: bool = False,
+        affinity: Union[Tuple[int, int], str] = None,
+        dtype: str = "f8",
+        matlab_session_name: str = None,
+        socket_buffer_size: int = CommSocket.SOCKET_BUFFER_SIZE,
     ):
         """Simulink environment base class implementing the Gym interface.
 
@@ -34,43 +102,130 @@ class SimulinkEnv(gym.Env):
                 TCP/IP port for receiving
             model_debug: bool, default: False
                 flag for debugging simulink model files (.slx)
+            ipc: string, default: "tcp"
+                type of the inter-process communication with the Simulink model,
+                either "tcp" (TCP/IP over localhost), "unix" (Unix domain stream
+                socket) or "unix_seqpacket" (message based Unix domain socket), the
+                Unix domain socket types require matching communication blocks in the
+                Simulink model, which get the socket paths from the workspace
+                variables GYM_RECV_SOCK_PATH and GYM_SEND_SOCK_PATH
+            copy_state: bool, default: True
+                flag for returning a new state array from every simulation step, if
+                False the state is written into one array reused for all steps, which
+                avoids an allocation per step but overwrites previously returned
+                states
+            check_actions: bool, default: False
+                flag for checking every action against the action space, otherwise
+                only the first action after each reset is checked (the shape of the
+                action is always checked)
+            affinity: tuple of two ints or "auto", default: None
+                CPUs for pinning the Python thread creating the environment (which
+                has to be the thread stepping it) and the Matlab thread running the
+                simulation (Linux only), "auto" picks two hyperthreads of the same
+                physical core, no pinning if None, note that threads started by the
+                pinned Python thread inherit its affinity until close() restores the
+                original affinities
+            dtype: string, default: "f8"
+                data type of the values exchanged with the Simulink model, either "f8"
+                (double) or "f4" (single), for "f4" the communication blocks of the
+                model have to use single precision
+            matlab_session_name: string, default: None
+                name of a shared Matlab session to run the simulation in, the
+                environment connects to a running session of this name or starts and
+                shares a new one, which is kept running after closing the environment
+                for reuse by further environments, a new Matlab engine is started for
+                every environment if None
+            socket_buffer_size: int, default: 1 MiB
+                size of the kernel send and receive buffers of the sockets in bytes,
+                the system default (with automatic tuning) is kept if None
         """
-        self.model_path = Path(model_path)
-        if not self.model_path.exists():
-            # Try as relative path:
-            self.model_path = Path(os.path.abspath(model_path))
-            if not self.model_path.exists():
-                raise ValueError(f"Could not find model under {self.model_path}")
+        try:
+            os.stat(model_path)
+        except FileNotFoundError:
+            raise ValueError(
+                f"Could not find model under {Path(os.path.abspath(model_path))}"
+            )
+        self.model_path = Path(os.path.abspath(model_path))
         self.model_dir = self.model_path.parent
         self.env_name = self.model_path.stem
         self.simulation_time = 0
         self.state = None
         self.model_debug = model_debug
+        # Action space to be defined in child class:
+        self._action_space = None
+        self.copy_state = copy_state
+        self.check_actions = check_actions
+        self.matlab_session_name = matlab_session_name
+        # Parameter changes applied to the simulation input on the next reset:
+        self._pending_block_params = {}
+        self._pending_model_params = {}
+        self._pending_variables = {}
 
         # Already prepared replacement for the done flag for Gym/Gymnasium>=0.26.0:
         self.terminated = True
         self.truncated = True
 
-        # Create TCP/IP sockets for communication between model and Python wrapper:
-        self.recv_socket = CommSocket(recv_port, "recv_socket")
-        self.send_socket = CommSocket(send_port, "send_socket")
+        # Create sockets for communication between model and Python wrapper:
+        if ipc == "tcp":
+            address_family, socket_type = socket.AF_INET, socket.SOCK_STREAM
+        elif ipc == "unix":
+            address_family, socket_type = socket.AF_UNIX, socket.SOCK_STREAM
+        elif ipc == "unix_seqpacket":
+            address_family, socket_type = socket.AF_UNIX, socket.SOCK_SEQPACKET
+        else:
+            raise ValueError(f"Unknown inter-process communication type {ipc}")
+
+        if not self.model_debug:
+            # The Matlab engine is only needed (and imported) if not in debug mode:
+            import matlab.engine
+
+            # Start Matlab engine in the background while setting up the sockets:
+            matlab_future = self._start_matlab()
+
+        try:
+            self.recv_socket = CommSocket(
+                recv_port,
+                "recv_socket",
+                address_family,
+                socket_type,
+                dtype,
+                socket_buffer_size,
+                socket_buffer_size,
+            )
+            self.send_socket = CommSocket(
+                send_port,
+                "send_socket",
+                address_family,
+                socket_type,
+                dtype,
+                socket_buffer_size,
+                socket_buffer_size,
+            )
+        except Exception:
+            if not self.model_debug:
+                # Don't leave the Matlab engine starting without an owner:
+                self._discard_matlab(matlab_future)
+            raise
 
         if not self.model_debug:
             # Setup simulation thread and Matlab engine if not in debug mode:
             self.simulation_thread = threading.Thread()
             # Setup Matlab engine:
-            logger.info("Starting Matlab engine")
             matlab_started = False
             start_trials = 0
-            # Try to start Matlab engine:
+            # Wait for Matlab engine and retry starting it if necessary:
             while not matlab_started and start_trials < 3:
                 try:
-                    self.matlab_engine = matlab.engine.start_matlab()
+                    self.matlab_engine = matlab_future.result()
                 except matlab.engine.RejectedExecutionError:
                     start_trials += 1
-                    logger.error("Unable to start Matlab engine. Retrying...")
+                    if start_trials < 3:
+                        logger.error("Unable to start Matlab engine. Retrying...")
+                        matlab_future = self._start_matlab()
                 else:
                     matlab_started = True
+                    if self.matlab_session_name:
+                        self._share_matlab()
                     logger.info("Adding components to Matlab path")
                     self.matlab_path = self.matlab_engine.addpath(
                         str(SIMULINK_BLOCK_LIB_PATH)
@@ -95,12 +250,148 @@ class SimulinkEnv(gym.Env):
             self.matlab_path = None
             self.sim_input = None
 
+        self._set_socket_path_variables()
+
+        # Affinities of pinned threads (0 for the calling thread) restored by close():
+        self._original_affinities = {}
+        if affinity is not None:
+            self._set_affinity(affinity)
+
+        # Flag for a running simulation (or a model started manually in debug mode):
+        self._simulation_alive = False
+
+    def _start_matlab(self):
+        """Start the Matlab engine in the background or connect to a shared session.
+
+        Returns:
+            future of the Matlab engine
+        """
+        import matlab.engine
+
+        # Only engines started here are quit when not needed:
+        self._new_matlab_engine = False
+        if self.matlab_session_name in _shared_matlab_engines:
+            logger.info(f"Reusing Matlab session {self.matlab_session_name}")
+            matlab_future = Future()
+            matlab_future.set_result(_shared_matlab_engines[self.matlab_session_name])
+        elif self.matlab_session_name and (
+            self.matlab_session_name in matlab.engine.find_matlab()
+        ):
+            logger.info(f"Connecting to Matlab session {self.matlab_session_name}")
+            matlab_future = matlab.engine.connect_matlab(
+                self.matlab_session_name, background=True
+            )
+        else:
+            logger.info("Starting Matlab engine")
+            matlab_future = matlab.engine.start_matlab(background=True)
+            self._new_matlab_engine = True
+        return matlab_future
+
+    def _discard_matlab(self, matlab_future):
+        """Cancel the start of a Matlab engine, which is not used.
+
+        The engine is quit if it already started, but only if it was started by this
+        environment, shared sessions are kept running.
+
+        Parameters:
+            matlab_future
+                future of the Matlab engine returned by _start_matlab()
+        """
+        if not self._new_matlab_engine:
+            return
+        with contextlib.suppress(Exception):
+            if not matlab_future.cancel():
+                matlab_future.result().quit()
+
+    def _share_matlab(self):
+        """Share the Matlab engine under the session name for further environments."""
+        _shared_matlab_engines[self.matlab_session_name] = self.matlab_engine
+        if not self.matlab_engine.matlab.engine.isEngineShared():
+            self.matlab_engine.matlab.engine.shareEngine(
+                self.matlab_session_name, nargout=0
+            )
+
+    def _set_socket_path_variables(self):
+        """Make the paths of Unix domain sockets available to the Simulink model.
+
+        The paths are set as the model workspace variables GYM_RECV_SOCK_PATH and
+        GYM_SEND_SOCK_PATH. In debug mode, the paths are only logged.
+        """
+        for var, comm_socket in (
+            ("GYM_RECV_SOCK_PATH", self.recv_socket),
+            ("GYM_SEND_SOCK_PATH", self.send_socket),
+        ):
+            if comm_socket.socket_path:
+                if self.model_debug:
+                    logger.info(f"{var}: {comm_socket.socket_path}")
+                else:
+                    self._pending_variables[var] = comm_socket.socket_path
+
+    def _set_affinity(self, affinity: Union[Tuple[int, int], str]):
+        """Pin the calling thread and the Matlab thread running the simulation to CPUs
+        (Linux only).
+
+        Running both ends of the socket communication on neighboring CPUs avoids
+        cross-core traffic for every simulation step. Other threads of Matlab (e.g.,
+        of the JVM) are not pinned. The original affinities are restored by
+        _restore_affinity().
+
+        Parameters:
+            affinity: tuple of two ints or "auto"
+                CPUs for the calling thread and the Matlab thread, "auto" picks two
+                hyperthreads of the same physical core
+        """
+        if not hasattr(os, "sched_setaffinity"):
+            logger.warn("CPU affinity can only be set on Linux. Ignoring affinity.")
+            return
+        python_cpu, matlab_cpu = _sibling_cpus() if affinity == "auto" else affinity
+        logger.info(f"Pinning Python to CPU {python_cpu}")
+        self._original_affinities[0] = os.sched_getaffinity(0)
+        os.sched_setaffinity(0, {python_cpu})
+        if self.matlab_engine:
+            matlab_pid = int(self.matlab_engine.feature("getpid"))
+            thread_ids = _matlab_interpreter_threads(matlab_pid)
+            if not thread_ids:
+                logger.warn("Matlab thread running the simulation not found.")
+            for thread_id in thread_ids:
+                logger.info(f"Pinning Matlab thread {thread_id} to CPU {matlab_cpu}")
+                self._original_affinities[thread_id] = os.sched_getaffinity(thread_id)
+                os.sched_setaffinity(thread_id, {matlab_cpu})
+
+    def _restore_affinity(self):
+        """Restore the affinities of the threads pinned by _set_affinity().
+
+        Has to be called from the thread which created the environment.
+        """
+        for thread_id, cpus in self._original_affinities.items():
+            # Matlab threads may have ended in the meantime:
+            with contextlib.suppress(OSError):
+                os.sched_setaffinity(thread_id, cpus)
+        self._original_affinities.clear()
+
     def __del__(self):
-        """Deletion of environment needs to also quit the Matlab engine."""
+        """Deletion of environment stops the simulation and closes the sockets.
+
+        Quitting the Matlab engine is a blocking call taking several seconds and is
+        therefore not executed inside the finalizer. Use close() or the environment as
+        a context manager for shutting down the Matlab engine explicitly, otherwise the
+        engine is terminated when the Python process exits.
+        """
+        with contextlib.suppress(Exception):
+            self.stop_simulation()
+            self.close_sockets()
+
+    def __enter__(self):
+        """Support of the with-statement for the environment."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the environment including the Matlab engine at the end of the
+        with-statement.
+        """
         self.close()
-        # Close matlab engine:
-        if self.matlab_engine:
-            self.matlab_engine.quit()
+        # Propagate exceptions:
+        return False
 
     @property
     def observations(self):
@@ -119,6 +410,50 @@ class SimulinkEnv(gym.Env):
         """
         self._observations = observations
         self.observation_space = self._observations.space
+        self._obs_dim = int(self.observation_space.shape[0])
+        # Received messages contain the observations and the simulation time stamp:
+        self._expected_recv_len = self._obs_dim + 1
+        self.recv_socket.set_message_size(
+            self.recv_socket.dtype.itemsize * self._expected_recv_len
+        )
+        # State buffer reused by sim_step() if the state is not copied:
+        self._state_buf = np.empty(self.observation_space.shape, dtype=np.float32)
+        # Split block parameter paths once for resetting the initial values:
+        self._block_observations = [
+            obs for obs in observations if obs.value_setter == self.set_block_parameter
+        ]
+        self._other_observations = [
+            obs for obs in observations if obs.value_setter != self.set_block_parameter
+        ]
+        self._block_paths = [
+            str(Path(obs.parameter).parent) for obs in self._block_observations
+        ]
+        self._block_params = [
+            str(Path(obs.parameter).stem) for obs in self._block_observations
+        ]
+
+    @property
+    def action_space(self):
+        """Getter method for action space."""
+        return self._action_space
+
+    @action_space.setter
+    def action_space(self, action_space: spaces.Space):
+        """Setter method for action space.
+
+        Also caches the action shape and allocates the buffer for sending actions.
+
+        Parameter:
+            action_space: gym.spaces.Space
+                action space of the environment
+        """
+        self._action_space = action_space
+        self._action_shape = tuple(self._action_space.shape)
+        # Reusable buffer for actions not already given as arrays of the data type
+        # sent to the simulation:
+        self._action_send_buf = np.empty(
+            self._action_shape, dtype=self.send_socket.dtype
+        )
 
     def _reset(self):
         """Method implementing the generic reset behavior.
@@ -135,20 +470,50 @@ class SimulinkEnv(gym.Env):
         self.state = self.set_initial_values()
 
         if not self.model_debug:
+            # Apply parameter changes with a single call to the Matlab engine:
+            self._apply_parameters()
             # Create and start simulation thread:
             self.simulation_thread = threading.Thread(
-                name="sim thread", target=self.matlab_engine.sim, args=(self.sim_input,)
+                name="sim thread", target=self._run_simulation
             )
+            self._simulation_alive = True
             self.simulation_thread.start()
+        else:
+            # The simulation is started manually in debug mode:
+            self._simulation_alive = True
 
         # Wait for connection to be established:
-        self.send_socket.wait_for_connection()
-        self.recv_socket.wait_for_connection()
+        CommSocket.wait_for_connections([self.send_socket, self.recv_socket])
 
         # Reset truncated and terminated flags:
         self.truncated = False
         self.terminated = False
 
+        self._bind_hot_path()
+
+    def _bind_hot_path(self):
+        """Bind the objects used in every simulation step to instance attributes.
+
+        This saves the repeated attribute lookups of the stepping in sim_step() and is
+        executed on every reset.
+        """
+        self._send = self.send_socket.send_data
+        self._recv = self.recv_socket.receive
+        self._contains = self.action_space.contains
+        # Always check the first action after a reset:
+        self._check_action = True
+
+    def _run_simulation(self):
+        """Target of the simulation thread running the simulation.
+
+        Clears the simulation flag once the simulation finished, also if the
+        simulation failed.
+        """
+        try:
+            self.matlab_engine.sim(self.sim_input)
+        finally:
+            self._simulation_alive = False
+
     def reset(self):
         """Method required by the Gym interface to be implemented by the child class.
 
@@ -161,7 +526,8 @@ class SimulinkEnv(gym.Env):
         """Stepping method for the Simulink model.
 
         This method implements the stepping of the Simulink model which should be called
-        by the child implementation of the step method.
+        by the child implementation of the step method. The environment has to be reset
+        before the first step.
 
         Parameters:
             action
@@ -179,28 +545,51 @@ class SimulinkEnv(gym.Env):
             terminated: bool
                 indicator for reaching a terminal state
         """
-        if self.model_debug or self.simulation_thread.is_alive():
+        if self._simulation_alive:
             # Check validity of action:
-            if not self.action_space.contains(action):
-                raise ValueError(f"Action {action} not in action space.")
+            if self._check_action:
+                if not self._contains(action):
+                    raise ValueError(f"Action {action} not in action space.")
+                self._check_action = self.check_actions
+            # The shape is checked on every step, since the action is sent to the
+            # model without further checks (instead of broadcasting it):
+            if np.shape(action) != self._action_shape:
+                raise ValueError(
+                    f"Shape of action {action} does not match the shape of the "
+                    f"action space {self._action_shape}"
+                )
             # Execute action:
-            self.send_data(np.array(action))
+            if (
+                isinstance(action, np.ndarray)
+                and action.dtype == self._action_send_buf.dtype
+            ):
+                set_values = action
+            else:
+                np.copyto(self._action_send_buf, action, casting="unsafe")
+                set_values = self._action_send_buf
+            self._send(set_values)
             # Receive data:
-            recv_data = self.recv_socket.receive()
+            recv_data = self._recv()
             # When the simulation is truncated an empty message is received:
-            if not recv_data:
+            if recv_data is None or not recv_data.size:
                 self.truncated = True
+                self._simulation_alive = False
             else:
-                if len(recv_data) == (self.observation_space.shape[0] + 1):
-                    # Extract simulation state from received data:
-                    self.state = np.array(recv_data[0:-1], ndmin=1, dtype=np.float32)
+                if len(recv_data) == self._expected_recv_len:
+                    # Extract simulation state from received data (the conversion
+                    # copies the data out of the reused receive buffer):
+                    if self.copy_state:
+                        self.state = recv_data[:-1].astype(np.float32)
+                    else:
+                        self._state_buf[:] = recv_data[:-1]
+                        self.state = self._state_buf
                     # Simulation timestamp is the last entry:
-                    self.simulation_time = recv_data[-1]
+                    self.simulation_time = float(recv_data[-1])
                 else:
                     logger.error(
                         f"Length of data received from the Simulink model invalid! "
                         f"Actual length is {len(recv_data)}, "
-                        f"but should be {self.observation_space.shape[0] + 1}\n"
+                        f"but should be {self._expected_recv_len}\n"
                         "There is possibly a problem with the block execution order of "
                         "the model (check project's known issues for more information)."
                     )
@@ -245,15 +634,15 @@ class SimulinkEnv(gym.Env):
                 flag for stopping the simulation
         """
         # Check validity of set_values and for running simulation:
-        if set_values.shape == self.action_space.shape:
-            if self.model_debug or self.simulation_thread.is_alive():
+        if set_values.shape == self._action_shape:
+            if self._simulation_alive:
                 self.send_socket.send_data(set_values, stop)
             else:
                 logger.info("No simulation running currently. No data can be sent.")
         else:
             raise Exception(
                 f"Wrong shape of data. The shape is {set_values.shape}, "
-                f"but should be {self.action_space.shape}."
+                f"but should be {self._action_shape}."
             )
 
     def set_workspace_variable(self, var: str, value: Union[int, float]):
@@ -267,7 +656,7 @@ class SimulinkEnv(gym.Env):
         https://www.mathworks.com/help/simulink/slref/simulink.simulationinput.setvariable.html
 
         Use this functionality sparsely as it can consume a lot of memory if
-        executed often!
+        executed often! The value is applied on the next reset.
 
         Parameters:
             var: string
@@ -277,9 +666,7 @@ class SimulinkEnv(gym.Env):
         """
         # Functionality only available if not in debug mode:
         if not self.model_debug:
-            self.sim_input = self.matlab_engine.setVariable(
-                self.sim_input, var, float(value), "Workspace", self.env_name
-            )
+            self._pending_variables[var] = float(value)
 
     def set_block_parameter(self, path: str, value: Union[int, float]):
         """Set parameter values of Simulink blocks.
@@ -288,7 +675,7 @@ class SimulinkEnv(gym.Env):
         https://www.mathworks.com/help/simulink/slref/simulink.simulationinput.setblockparameter.html
 
         Use this functionality sparsely as it can consume a lot of memory if
-        executed often!
+        executed often! The value is applied on the next reset.
 
         Parameters:
             path: string
@@ -300,9 +687,46 @@ class SimulinkEnv(gym.Env):
         if not self.model_debug:
             block_path = str(Path(path).parent)
             param = str(Path(path).stem)
-            value = str(value)
-            self.sim_input = self.matlab_engine.setBlockParameter(
-                self.sim_input, block_path, param, value
+            self._pending_block_params[(block_path, param)] = str(value)
+
+    def set_block_parameters(self, paths: List[str], values: List[Union[int, float]]):
+        """Set parameter values of multiple Simulink blocks at once.
+
+        Same as calling set_block_parameter() for each parameter.
+
+        Parameters:
+            paths: list of strings
+                paths of the block parameters
+            values: list of ints or floats
+                values of the block parameters
+        """
+        self._set_block_parameters(
+            [str(Path(path).parent) for path in paths],
+            [str(Path(path).stem) for path in paths],
+            values,
+        )
+
+    def _set_block_parameters(
+        self,
+        block_paths: List[str],
+        params: List[str],
+        values: List[Union[int, float]],
+    ):
+        """Set parameter values of multiple Simulink blocks given by block path and
+        parameter name.
+
+        Parameters:
+            block_paths: list of strings
+                paths of the blocks
+            params: list of strings
+                names of the block parameters
+            values: list of ints or floats
+                values of the block parameters
+        """
+        # Functionality only available if not in debug mode:
+        if not self.model_debug:
+            self._pending_block_params.update(
+                zip(zip(block_paths, params), [str(value) for value in values])
             )
 
     def set_model_parameter(self, param: str, value: Union[int, float]):
@@ -312,7 +736,7 @@ class SimulinkEnv(gym.Env):
         https://www.mathworks.com/help/simulink/slref/simulink.simulationinput.setmodelparameter.html
 
         Use this functionality sparsely as it can consume a lot of memory if
-        executed often!
+        executed often! The value is applied on the next reset.
 
         Parameters:
             param: string
@@ -322,9 +746,34 @@ class SimulinkEnv(gym.Env):
         """
         # Functionality only available if not in debug mode:
         if not self.model_debug:
-            self.sim_input = self.matlab_engine.setModelParameter(
-                self.sim_input, param, str(value)
+            self._pending_model_params[param] = str(value)
+
+    def _apply_parameters(self):
+        """Apply all pending parameter changes to the simulation input.
+
+        Block parameters, model parameters and workspace variables are set with a
+        single call to the Matlab engine. Only the last value set for a parameter is
+        applied.
+        """
+        if (
+            self._pending_block_params
+            or self._pending_model_params
+            or self._pending_variables
+        ):
+            self.sim_input = self.matlab_engine.simulink_gym_set_params(
+                self.sim_input,
+                self.env_name,
+                [block_path for block_path, _ in self._pending_block_params],
+                [param for _, param in self._pending_block_params],
+                list(self._pending_block_params.values()),
+                list(self._pending_model_params),
+                list(self._pending_model_params.values()),
+                list(self._pending_variables),
+                list(self._pending_variables.values()),
             )
+            self._pending_block_params.clear()
+            self._pending_model_params.clear()
+            self._pending_variables.clear()
 
     def set_initial_values(self):
         """Set the initial values of the state/observations.
@@ -335,22 +784,30 @@ class SimulinkEnv(gym.Env):
             initial state according to observation space
         """
         try:
-            # Functionality only available if not in debug mode:
-            if not self.model_debug:
-                self.observations.reset_values()
+            observations = self.observations
         except AttributeError:
             raise AttributeError("Environment observations not defined")
 
-        return self.observations.initial_state
+        # Functionality only available if not in debug mode:
+        if not self.model_debug:
+            self._set_block_parameters(
+                self._block_paths,
+                self._block_params,
+                [obs.initial_value for obs in self._block_observations],
+            )
+            for obs in self._other_observations:
+                obs.reset_value()
+
+        return observations.initial_state
 
     def _send_stop_signal(self):
         """Method for sending the stop signal to the simulation."""
-        set_values = np.zeros(self.action_space.shape)
+        set_values = np.zeros(self._action_shape)
         self.send_data(set_values, stop=True)
 
     def stop_simulation(self):
         """Method for stopping the simulation."""
-        if self.model_debug or self.simulation_thread.is_alive():
+        if self._simulation_alive:
             try:
                 self._send_stop_signal()
             except Exception:
@@ -361,10 +818,11 @@ class SimulinkEnv(gym.Env):
             else:
                 # Clear receive data queue:
                 _ = self.recv_socket.receive()
-            finally:
-                if not self.model_debug:
-                    self.simulation_thread.join()
+        if self.simulation_thread and self.simulation_thread.is_alive():
+            # Wait for the simulation to finish:
+            self.simulation_thread.join()
 
+        self._simulation_alive = False
         self.truncated = True
 
     def open_sockets(self):
@@ -378,10 +836,23 @@ class SimulinkEnv(gym.Env):
         self.send_socket.close()
 
     def close(self):
-        """Method for closing/shutting down the simulation."""
+        """Method for closing/shutting down the simulation and the Matlab engine."""
         self.stop_simulation()
         # Close sockets:
         self.close_sockets()
+        self._restore_affinity()
+        # Close Matlab engine in the background, since quitting blocks for seconds,
+        # shared sessions are kept running for further environments:
+        if self.matlab_engine:
+            if not self.matlab_session_name:
+                try:
+                    threading.Thread(
+                        name="matlab quit", target=self.matlab_engine.quit, daemon=True
+                    ).start()
+                except RuntimeError:
+                    # No new threads during interpreter shutdown:
+                    self.matlab_engine.quit()
+            self.matlab_engine = None
 
     def render(self):
         """Render method recommended by the Gym interface.
@@ -7,6 +7,16 @@ from . import logger
 class Observation:
     """Class for representation of environment observations."""
 
+    __slots__ = (
+        "name",
+        "_space",
+        "_low",
+        "_high",
+        "_storage",
+        "parameter",
+        "_value_setter",
+    )
+
     def __init__(
         self,
         name: str,
@@ -46,38 +56,59 @@ class Observation:
                 will be sampled from the observation space if None
         """
         self.name = name
-        self.space = Box(low=low, high=high, shape=(1,), dtype=np.float32)
+        # Space limits (in single precision like the space) as floats for checking
+        # initial values without the space, which is only created when needed:
+        self._low = float(np.float32(low))
+        self._high = float(np.float32(high))
+        self._space = None
+        # Storage of the initial value, replaced by a view of the combined initial
+        # state when added to Observations:
+        self._storage = np.empty(1, dtype=np.float32)
 
         self.initial_value = initial_value if initial_value else self.space.sample()[0]
         self.parameter = parameter
         self._value_setter = value_setter
 
+    @property
+    def space(self):
+        """Observation space of the single observation."""
+        if self._space is None:
+            self._space = Box(
+                low=self._low, high=self._high, shape=(1,), dtype=np.float32
+            )
+        return self._space
+
     def _check_initial_value(self, value):
         """Check initial value of observation."""
-        value = np.array(value, ndmin=1, dtype=np.float32)
-        if not self.space.contains(value):
+        # Check in single precision like the space (also fails for NaN):
+        value = float(np.float32(value))
+        if not self._low <= value <= self._high:
             raise ValueError(
                 f"Observation {self.name}: "
                 f"Initial value {value} not inside space limits "
-                f"([{self.space.low}, {self.space.high}]). "
-                f"{self.space.shape}, {value.shape}"
+                f"([{self._low}, {self._high}])"
             )
 
     @property
     def initial_value(self):
         """Initial value of the observation."""
-        return self._initial_value
+        return self._storage[0]
 
     @initial_value.setter
     def initial_value(self, value):
         """Set method for the initial value"""
-        logger.debug(f"Setting {self.name} to {value}")
+        logger.debug("Setting %s to %s", self.name, value)
         self._check_initial_value(value)
-        self._initial_value = value
+        self._storage[0] = value
+
+    @property
+    def value_setter(self):
+        """Method for setting the initial value in the simulation object."""
+        return self._value_setter
 
     def resample_initial_value(self):
         """Resample the initial value according to observation space."""
-        self._initial_value = self.space.sample()[0]
+        self._storage[0] = self.space.sample()[0]
 
     def reset_value(self):
         """Set the initial value in the simulation object."""
@@ -94,16 +125,19 @@ class Observations:
             observations: list of observations
         """
         self._observations = observations
+        num_observations = len(self._observations)
+        self._lows = np.empty(num_observations, dtype=np.float32)
+        self._highs = np.empty(num_observations, dtype=np.float32)
+        # Initial values of all observations stored in one array, the single
+        # observations read and write their initial value through views of it:
+        self._initial_state = np.empty(num_observations, dtype=np.float32)
+        for index, observation in enumerate(self._observations):
+            self._lows[index] = observation._low
+            self._highs[index] = observation._high
+            self._initial_state[index] = observation.initial_value
+            observation._storage = self._initial_state[index : index + 1]
         # Create combined observation space from single observations:
-        lows = np.array(
-            [observation.space.low[0] for observation in self._observations],
-            dtype=np.float32,
-        )
-        highs = np.array(
-            [observation.space.high[0] for observation in self._observations],
-            dtype=np.float32,
-        )
-        self.space = Box(low=lows, high=highs)
+        self.space = Box(low=self._lows, high=self._highs)
 
     def __getitem__(self, index: int):
         """Method for indexing of observations list."""
@@ -123,20 +157,32 @@ class Observations:
 
     def resample_all_initial_values(self):
         """Resampling all observations."""
-        self.initial_state = self.space.sample()
+        # Samples are inside the space limits by construction, so they are written
+        # directly without checking them:
+        self._initial_state[:] = self.space.sample()
 
     @property
     def initial_state(self):
         """Combined initial state of all observations as numpy array."""
-        initial_state = [obs.initial_value for obs in self._observations]
-        return np.array(initial_state, ndmin=1, dtype=np.float32)
+        return self._initial_state.copy()
 
     @initial_state.setter
     def initial_state(self, values: np.ndarray):
         """Set method for the initial state"""
         if values.shape == self.space.shape:
-            for index, observation in enumerate(self._observations):
-                observation.initial_value = values[index]
+            logger.debug("Setting initial state to %s", values)
+            values = values.astype(np.float32, copy=False)
+            inside = (values >= self._lows) & (values <= self._highs)
+            if not inside.all():
+                names = [
+                    obs.name for obs, ok in zip(self._observations, inside) if not ok
+                ]
+                raise ValueError(
+                    f"Observations {names}: "
+                    f"Initial values {values[~inside]} not inside space limits "
+                    f"([{self._lows[~inside]}, {self._highs[~inside]}])"
+                )
+            self._initial_state[:] = values
         else:
             raise ValueError(
                 f"Shape of values ({values.shape}) not equal to "
@@ -1,7 +1,9 @@
-import threading
+import os
+import selectors
+import tempfile
+import time
 import socket
 from .. import logger
-import array
 import numpy as np
 import struct
 
@@ -12,8 +14,21 @@ class CommSocket:
     """
 
     HOST = "localhost"
+    RECV_BUFFER_SIZE = 2048
+    SOCKET_BUFFER_SIZE = 1 << 20
+    # Scatter-gather I/O is not available on all platforms (e.g., Windows):
+    _scatter_gather = hasattr(socket.socket, "sendmsg")
 
-    def __init__(self, port: int, name: str = None):
+    def __init__(
+        self,
+        port: int,
+        name: str = None,
+        address_family: int = socket.AF_INET,
+        socket_type: int = socket.SOCK_STREAM,
+        dtype: str = "f8",
+        sndbuf: int = SOCKET_BUFFER_SIZE,
+        rcvbuf: int = SOCKET_BUFFER_SIZE,
+    ):
         """Class defining the sockets necessary for communication with the Simulink
         simulation.
 
@@ -21,63 +36,172 @@ class CommSocket:
             port: int
             name: string, default: None
                 optional name of the socket for debugging purposes
+            address_family: int, default: socket.AF_INET
+                address family of the socket, with socket.AF_UNIX a Unix domain
+                socket bound to a file path derived from the process ID and the port
+                is used instead of TCP/IP
+            socket_type: int, default: socket.SOCK_STREAM
+                type of the socket, e.g., socket.SOCK_SEQPACKET for a message based
+                Unix domain socket
+            dtype: string, default: "f8"
+                data type of the transmitted values, either "f8" (double) or "f4"
+                (single), always transmitted in little-endian byte order
+            sndbuf: int, default: 1 MiB
+                size of the kernel send buffer in bytes, the system default (with
+                automatic tuning) is kept if None
+            rcvbuf: int, default: 1 MiB
+                size of the kernel receive buffer in bytes, the system default (with
+                automatic tuning) is kept if None
         """
         self._debug_prefix = f"{name}: " if name else ""
         self.port = port
+        self.address_family = address_family
+        self._socket_type = socket_type
+        self._buffer_sizes = {socket.SO_SNDBUF: sndbuf, socket.SO_RCVBUF: rcvbuf}
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+        if self.dtype.kind != "f" or self.dtype.itemsize not in (4, 8):
+            raise ValueError(f"Unsupported data type {dtype}, use 'f8' or 'f4'")
+        # Both possible stop flags packed once, sent in front of the data:
+        self._flag_run = struct.pack("<" + self.dtype.char, 0)
+        self._flag_stop = struct.pack("<" + self.dtype.char, 1)
+        if self.address_family == socket.AF_INET:
+            self.socket_path = None
+            self._bind_address = (self.HOST, self.port)
+        else:
+            self.socket_path = os.path.join(
+                tempfile.gettempdir(), f"simulink_gym_{os.getpid()}_{self.port}.sock"
+            )
+            self._bind_address = self.socket_path
+        # Quick ACKs are only available for TCP on Linux:
+        self._quickack = self.address_family == socket.AF_INET and hasattr(
+            socket, "TCP_QUICKACK"
+        )
         self.connection = None
         self.address = None
-        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.connect_socket_thread = threading.Thread()
+        # Receive buffer reused for all messages, received into as raw bytes:
+        self._recv_buffer = np.empty(
+            self.RECV_BUFFER_SIZE // self.dtype.itemsize, dtype=self.dtype
+        )
+        self._recv_view = memoryview(self._recv_buffer).cast("B")
+        self._message_size = None
+        # Message buffer for sending without scatter-gather I/O, created on first send
+        # and only replaced by a larger one if needed:
+        self._send_buffer = bytearray()
+        self._send_view = memoryview(self._send_buffer)
+        self.server = self._create_server()
+        self._listening = False
 
-    def _open_socket(self, timeout=300):
-        """Method for opening the socket and waiting for connection.
+    def _create_server(self):
+        """Method for creating the (not yet bound) server socket.
 
-        Parameters:
-            timeout, default: 300 s
-                timeout for waiting for connection
+        Returns:
+            server socket according to the address family
         """
-        if self.is_connected():
-            logger.info(f"{self._debug_prefix}Socket already connected")
+        server = socket.socket(self.address_family, self._socket_type)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.address_family == socket.AF_INET:
+            server.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Buffer sizes are inherited by the accepted connections:
+        for option, size in self._buffer_sizes.items():
+            if size is None:
+                continue
+            server.setsockopt(socket.SOL_SOCKET, option, size)
+            if server.getsockopt(socket.SOL_SOCKET, option) < size:
+                logger.info(
+                    f"{self._debug_prefix}Socket buffer size limited by the system to "
+                    f"{server.getsockopt(socket.SOL_SOCKET, option)} bytes"
+                )
+        return server
+
+    def _remove_socket_file(self):
+        """Method for removing the file of a Unix domain socket."""
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def open_socket(self):
+        """Method for opening the socket for the connection of the simulation.
+
+        The socket listens without blocking, the connection is accepted by
+        wait_for_connection() or wait_for_connections().
+        """
+        if self.is_connected() or self._listening:
+            logger.error(f"{self._debug_prefix}Socket already opened or connected")
         else:
-            self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server.setblocking(True)
-            self.server.bind((self.HOST, self.port))
+            self.server = self._create_server()
+            # Remove stale socket file of a previous connection (AF_UNIX only):
+            self._remove_socket_file()
+            self.server.bind(self._bind_address)
             self.server.listen(1)
-            self.server.settimeout(timeout)
-            try:
-                self.connection, self.address = self.server.accept()
-            except socket.timeout:
-                self.server.shutdown(socket.SHUT_RDWR)
-                self.server.close()
-                self.connection = None
-                raise TimeoutError
-            except Exception:
-                self.server.shutdown(socket.SHUT_RDWR)
-                self.server.close()
-                self.connection = None
+            self.server.setblocking(False)
+            self._listening = True
 
-    def open_socket(self):
-        """Method creating a thread for connecting with the simulation."""
-        if not self.is_connected():
-            self.connect_socket_thread = threading.Thread(
-                name="socket._open_socket()", target=self._open_socket
+    def _accept(self):
+        """Method for accepting the pending connection of the simulation."""
+        self.connection, self.address = self.server.accept()
+        self._listening = False
+        self.connection.setblocking(True)
+        if self.address_family == socket.AF_INET:
+            # Send small messages immediately instead of waiting for coalescing them
+            # (Nagle's algorithm), set again since not all systems pass this option on
+            # from the listening socket:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self._quickack:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+
+    def _close_server(self):
+        """Method for closing the listening socket."""
+        self._listening = False
+        try:
+            self.server.close()
+        except OSError:
+            pass
+
+    def set_message_size(self, message_size: int):
+        """Set the size of the messages received from the simulation.
+
+        With a known message size, receive() continues reading until at least the
+        complete message arrived (stream sockets only) instead of returning the data
+        of a single read.
+
+        Parameters:
+            message_size: int
+                size of a message in bytes
+        """
+        if 2 * message_size > self._recv_buffer.nbytes:
+            # Leave room for surplus data (e.g., a message sent twice), which is then
+            # received and detected by its length:
+            self._recv_buffer = np.empty(
+                -(-2 * message_size // self.dtype.itemsize), dtype=self.dtype
             )
-            self.connect_socket_thread.start()
-        else:
-            logger.error(f"{self._debug_prefix}Socket already opened or connected")
+            self._recv_view = memoryview(self._recv_buffer).cast("B")
+        self._message_size = message_size
 
     def receive(self):
         """Method for receiving data from the simulation.
 
         Returns:
-            raw data received over the socket
+            numpy.ndarray of the received values (according to the data type), which
+            is a view of the receive buffer and therefore only valid until the next
+            call of this method
         """
         if self.is_connected():
-            data = self.connection.recv(2048)
-            data_array = array.array("d", data)
-            return data_array
+            # Read everything queued, so surplus data is not left for the next step:
+            received = self.connection.recv_into(self._recv_view)
+            if self._message_size and self._socket_type != socket.SOCK_SEQPACKET:
+                # Continue reading a message arriving in several segments, a record of
+                # a message based socket is always one complete message:
+                while 0 < received < self._message_size:
+                    nbytes = self.connection.recv_into(self._recv_view[received:])
+                    if not nbytes:
+                        # Connection closed by the simulation:
+                        break
+                    received += nbytes
+            if self._quickack:
+                # Acknowledge immediately instead of delaying the ACK, the kernel
+                # resets this option after every receive:
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+            # Only complete values can be interpreted:
+            return self._recv_buffer[: received // self.dtype.itemsize]
         else:
             logger.error(
                 f"{self._debug_prefix}Socket not connected, nothing to receive"
@@ -94,25 +218,43 @@ class CommSocket:
                 flag for stopping the simulation
         """
         if self.is_connected():
-            set_values = set_values.flatten()
-            byte_order_str = "<d" + "d" * set_values.size
-            msg = struct.pack(byte_order_str, int(stop), *set_values)
-            self.connection.sendall(msg)
+            # The message consists of the stop flag followed by the data, all of the
+            # socket's data type:
+            values = np.ascontiguousarray(set_values, dtype=self.dtype)
+            flag = self._flag_stop if stop else self._flag_run
+            if self._scatter_gather:
+                # Send stop flag and data in one call without copying the data:
+                self._send_all([flag, memoryview(values).cast("B")])
+            else:
+                flag_size = self.dtype.itemsize
+                message_size = flag_size + values.nbytes
+                if message_size > len(self._send_buffer):
+                    self._send_buffer = bytearray(message_size)
+                    self._send_view = memoryview(self._send_buffer)
+                self._send_view[:flag_size] = flag
+                self._send_view[flag_size:message_size] = memoryview(values).cast("B")
+                self.connection.sendall(self._send_view[:message_size])
         else:
             logger.error(f"{self._debug_prefix}Socket not connected, data not sent")
 
+    def _send_all(self, buffers: list):
+        """Method for sending multiple buffers as one message (scatter-gather I/O).
+
+        Parameters:
+            buffers: list
+                list of bytes-like objects sent in the given order
+        """
+        sent = self.connection.sendmsg(buffers)
+        if sent < sum(len(buffer) for buffer in buffers):
+            # Send the remainder of a partial send:
+            self.connection.sendall(b"".join(buffers)[sent:])
+
     def close(self):
         """Method for closing the socket."""
-        if self.connect_socket_thread.is_alive():
-            self.connect_socket_thread.join()
-            # This either times out, which causes a TimeoutError, or results in a
-            # connection, which can be closed now:
         if self.connection:
             try:
                 self.connection.shutdown(socket.SHUT_RDWR)
                 self.connection.close()
-                self.server.shutdown(socket.SHUT_RDWR)
-                self.server.close()
             except Exception:
                 # This catches an error appearing after some time in the training
                 # process. It seems that the socket used to send the data to the
@@ -126,16 +268,56 @@ class CommSocket:
             self.address = None
         else:
             logger.info(f"{self._debug_prefix}Socket not connected, nothing to close")
+        self._close_server()
+        self._remove_socket_file()
 
     def is_connected(self):
         """Check for connection of the socket."""
-        return self.connection is not None and not self.connect_socket_thread.is_alive()
+        return self.connection is not None
 
-    def wait_for_connection(self, timeout: float = None):
+    def wait_for_connection(self, timeout: float = 300):
         """Method for waiting for connection.
 
         Parameters:
-            timeout: float, default: None
-                timeout for the joining of the connection thread
+            timeout: float, default: 300 s
+                timeout for waiting for connection
+        """
+        self.wait_for_connections([self], timeout)
+
+    @staticmethod
+    def wait_for_connections(comm_sockets: list, timeout: float = 300):
+        """Method for waiting for the connections of multiple sockets at once.
+
+        All opened sockets are watched by a single selector, so no thread per socket is
+        necessary for accepting the connections.
+
+        Parameters:
+            comm_sockets: list
+                list of CommSocket objects opened with open_socket()
+            timeout: float, default: 300 s
+                timeout for waiting for all connections
+
+        Raises:
+            TimeoutError: if not all sockets are connected before the timeout
         """
-        self.connect_socket_thread.join(timeout=timeout)
+        deadline = time.monotonic() + timeout
+        with selectors.DefaultSelector() as selector:
+            for comm_socket in comm_sockets:
+                if comm_socket._listening:
+                    selector.register(
+                        comm_socket.server, selectors.EVENT_READ, comm_socket
+                    )
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                events = selector.select(remaining) if remaining > 0 else []
+                if not events:
+                    for key in selector.get_map().values():
+                        key.data._close_server()
+                    raise TimeoutError("Timeout while waiting for connection")
+                for key, _ in events:
+                    try:
+                        key.data._accept()
+                    except BlockingIOError:
+                        # Connection attempt aborted before it was accepted:
+                        continue
+                    selector.unregister(key.fileobj)